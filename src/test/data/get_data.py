@@ -6,6 +6,13 @@ This script generates a suite of h5ad files for testing nf-anndata's ability
 to read various structural variations possible in h5ad files.
 """
 
+import argparse
+import multiprocessing
+import os
+import zlib
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
 import numpy as np
 import pandas as pd
 from scipy import sparse
@@ -13,6 +20,11 @@ import anndata as ad
 from pathlib import Path
 from tqdm import tqdm
 
+try:
+    from anndata.io import write_h5ad
+except ImportError:  # anndata < 0.11
+    from anndata._io import write_h5ad
+
 # Get the directory where this script is located
 SCRIPT_DIR = Path(__file__).parent.resolve()
 
@@ -24,721 +36,501 @@ output_dir.mkdir(exist_ok=True)
 N_OBS = 20
 N_VARS = 10
 
+# Default obs/var names shared by all generators
+OBS_NAMES = np.char.add("cell_", np.arange(N_OBS).astype(str)).tolist()
+VAR_NAMES = np.char.add("gene_", np.arange(N_VARS).astype(str)).tolist()
+
+# Column-less obs/var skeletons. anndata may touch the frames it is given,
+# so hand out shallow copies (.copy(deep=False)) rather than these objects.
+EMPTY_OBS = pd.DataFrame(index=OBS_NAMES)
+EMPTY_VAR = pd.DataFrame(index=VAR_NAMES)
+
 # Set random seed for reproducible output
 RANDOM_SEED = 42
 rng = np.random.default_rng(RANDOM_SEED)
-# For scipy sparse.random, we need a RandomState or integer seed
-sparse_rng = np.random.RandomState(RANDOM_SEED)
 
+# Default X matrix for generators that aren't testing X itself. It is shared
+# between AnnData objects, so make it read-only to guard against mutation.
+X_DEFAULT = rng.random((N_OBS, N_VARS), dtype=np.float32)
+X_DEFAULT.flags.writeable = False
 
-def generate_index_unnamed():
-    """Generate h5ad with unnamed index (default, stored as _index)."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=pd.DataFrame({"cluster": rng.choice(["A", "B", "C"], N_OBS)}, index=obs_names),
-        var=pd.DataFrame({"gene_type": rng.choice(["protein", "rna"], N_VARS)}, index=var_names)
-    )
-    # Ensure index is unnamed
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "index_unnamed.h5ad")
 
+def _write(adata, filename, **dataset_kwargs):
+    """Write an AnnData object to ``output_dir / filename`` with ``write_h5ad``.
 
-def generate_index_named():
-    """Generate h5ad with named index."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    obs_df = pd.DataFrame({"cluster": rng.choice(["A", "B", "C"], N_OBS)}, index=obs_names)
-    obs_df.index.name = "cell_id"
-    
-    var_df = pd.DataFrame({"gene_type": rng.choice(["protein", "rna"], N_VARS)}, index=var_names)
-    var_df.index.name = "gene_id"
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=obs_df,
-        var=var_df
+    Dataset modification times are not recorded (``track_times=False``), so
+    regenerated files are byte-identical. Extra keyword arguments are passed on
+    as ``dataset_kwargs`` (e.g. ``compression="gzip"``).
+    """
+    write_h5ad(
+        output_dir / filename,
+        adata,
+        dataset_kwargs={"track_times": False, **dataset_kwargs},
     )
-    
-    adata.write_h5ad(output_dir / "index_named.h5ad")
 
 
-def generate_index_integer():
-    """Generate h5ad with integer-based index."""
-    obs_names = pd.Index(range(N_OBS), dtype="int64")
-    var_names = pd.Index(range(N_VARS), dtype="int64")
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=pd.DataFrame({"cluster": rng.choice(["A", "B", "C"], N_OBS)}, index=obs_names),
-        var=pd.DataFrame({"gene_type": rng.choice(["protein", "rna"], N_VARS)}, index=var_names)
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "index_integer.h5ad")
+def _rand_cat(categories, n, ordered=False):
+    """Draw a random categorical of length ``n`` directly from integer codes."""
+    codes = rng.integers(0, len(categories), n, dtype=np.int8)
+    return pd.Categorical.from_codes(codes, categories=categories, ordered=ordered)
 
 
-def generate_dtypes_numeric():
-    """Generate h5ad with various numeric column types."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    obs = pd.DataFrame({
-        "int8": rng.integers(-128, 127, N_OBS, dtype=np.int8),
-        "int16": rng.integers(-32768, 32767, N_OBS, dtype=np.int16),
-        "int32": rng.integers(-2147483648, 2147483647, N_OBS, dtype=np.int32),
-        "int64": rng.integers(-100, 100, N_OBS, dtype=np.int64),
-        "uint8": rng.integers(0, 255, N_OBS, dtype=np.uint8),
-        "float32": rng.random(N_OBS, dtype=np.float32),
-        "float64": rng.random(N_OBS, dtype=np.float64),
-    }, index=obs_names)
-    
-    var = pd.DataFrame({
-        "int32": rng.integers(0, 100, N_VARS, dtype=np.int32),
-        "float32": rng.random(N_VARS, dtype=np.float32),
-    }, index=var_names)
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=obs,
-        var=var
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "dtypes_numeric.h5ad")
+def _rand_sparse(n, m, density, fmt, dtype=np.float32):
+    """Draw a random ``n`` x ``m`` sparse matrix with the given density and format.
 
+    Unique positions are sampled directly, so unlike ``sparse.random`` no
+    sorting and de-duplication pass is needed.
+    """
+    nnz = round(density * n * m)
+    rows, cols = np.divmod(rng.choice(n * m, nnz, replace=False), m)
+    data = rng.random(nnz, dtype=dtype)
+    return sparse.coo_matrix((data, (rows, cols)), shape=(n, m)).asformat(fmt)
+
+
+# X matrix factories, keyed by Case.X
+X_FACTORIES = {
+    "default": lambda: X_DEFAULT,
+    "dense_f32": lambda: rng.random((N_OBS, N_VARS), dtype=np.float32),
+    "dense_f64": lambda: rng.random((N_OBS, N_VARS), dtype=np.float64),
+    "sparse_csr": lambda: _rand_sparse(N_OBS, N_VARS, 0.1, "csr"),
+    "sparse_csc": lambda: _rand_sparse(N_OBS, N_VARS, 0.1, "csc"),
+    "none": lambda: None,
+}
+
+
+@dataclass(frozen=True)
+class Case:
+    """Declarative description of a single generated test file.
+
+    ``obs``, ``var`` and ``extra`` are called at build time (after the RNG has
+    been seeded for this case). ``obs``/``var`` default to empty DataFrames
+    with the standard names; ``extra`` returns further ``ad.AnnData`` keyword
+    arguments (``obsm``, ``layers``, ``uns``, ...). ``write_kwargs`` are passed
+    on to :func:`_write`.
+    """
 
-def generate_dtypes_categorical():
-    """Generate h5ad with categorical columns (ordered and unordered)."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    obs = pd.DataFrame({
-        "cat_unordered": pd.Categorical(rng.choice(["A", "B", "C"], N_OBS), ordered=False),
-        "cat_ordered": pd.Categorical(rng.choice(["low", "medium", "high"], N_OBS), 
-                                        categories=["low", "medium", "high"], ordered=True),
-    }, index=obs_names)
-    
-    var = pd.DataFrame({
-        "cat_unordered": pd.Categorical(rng.choice(["type1", "type2"], N_VARS), ordered=False),
-    }, index=var_names)
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=obs,
-        var=var
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "dtypes_categorical.h5ad")
+    name: str
+    X: str = "default"
+    obs: Optional[Callable[[], pd.DataFrame]] = None
+    var: Optional[Callable[[], pd.DataFrame]] = None
+    extra: Optional[Callable[[], dict]] = None
+    write_kwargs: dict = field(default_factory=dict)
 
 
-def generate_dtypes_boolean():
-    """Generate h5ad with boolean columns."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    obs = pd.DataFrame({
-        "is_selected": rng.choice([True, False], N_OBS).astype(bool),
-        "is_valid": rng.choice([True, False], N_OBS).astype(bool),
-    }, index=obs_names)
-    
-    var = pd.DataFrame({
-        "is_marker": rng.choice([True, False], N_VARS).astype(bool),
-    }, index=var_names)
-    
+def build_and_write(case):
+    """Build the AnnData object described by ``case`` and write it to disk."""
     adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=obs,
-        var=var
+        X=X_FACTORIES[case.X](),
+        obs=case.obs() if case.obs else EMPTY_OBS.copy(deep=False),
+        var=case.var() if case.var else EMPTY_VAR.copy(deep=False),
+        **(case.extra() if case.extra else {}),
     )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "dtypes_boolean.h5ad")
+    _write(adata, f"{case.name}.h5ad", **case.write_kwargs)
 
 
-def generate_dtypes_nullable():
-    """Generate h5ad with nullable integer and boolean types."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    # Create nullable integer array
+def _dtypes_nullable_obs():
+    """obs with nullable integer and boolean columns."""
+    # Draw the int mask, bool values and bool mask in one go
+    int_mask, bool_values, bool_mask = rng.integers(0, 2, size=(3, N_OBS), dtype=bool)
     int_values = rng.integers(0, 100, N_OBS, dtype=np.int32)
-    int_mask = rng.choice([True, False], N_OBS)
-    nullable_int = pd.arrays.IntegerArray(int_values, mask=int_mask)
-    
-    # Create nullable boolean array
-    bool_values = rng.choice([True, False], N_OBS).astype(bool)
-    bool_mask = rng.choice([True, False], N_OBS).astype(bool)
-    nullable_bool = pd.arrays.BooleanArray(bool_values, mask=bool_mask)
-    
-    obs = pd.DataFrame({
-        "nullable_int": nullable_int,
-        "nullable_bool": nullable_bool,
-    }, index=obs_names)
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=obs,
-        var=pd.DataFrame(index=var_names)
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "dtypes_nullable.h5ad")
-
-
-def generate_dtypes_string():
-    """Generate h5ad with string columns."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    obs = pd.DataFrame({
-        "sample_id": [f"sample_{i}" for i in range(N_OBS)],
-        "batch": rng.choice(["batch1", "batch2", "batch3"], N_OBS),
-    }, index=obs_names)
-    
-    var = pd.DataFrame({
-        "gene_symbol": [f"GENE_{i}" for i in range(N_VARS)],
-    }, index=var_names)
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=obs,
-        var=var
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "dtypes_string.h5ad")
-
-
-def generate_x_dense_float32():
-    """Generate h5ad with dense float32 X matrix."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=pd.DataFrame(index=obs_names),
-        var=pd.DataFrame(index=var_names)
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "x_dense_float32.h5ad")
-
-
-def generate_x_dense_float64():
-    """Generate h5ad with dense float64 X matrix."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float64),
-        obs=pd.DataFrame(index=obs_names),
-        var=pd.DataFrame(index=var_names)
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "x_dense_float64.h5ad")
-
-
-def generate_x_sparse_csr():
-    """Generate h5ad with CSR sparse X matrix."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    # Create sparse matrix with ~10% density
-    X = sparse.random(N_OBS, N_VARS, density=0.1, format='csr', dtype=np.float32, random_state=sparse_rng)
-    
-    adata = ad.AnnData(
-        X=X,
-        obs=pd.DataFrame(index=obs_names),
-        var=pd.DataFrame(index=var_names)
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "x_sparse_csr.h5ad")
-
-
-def generate_x_sparse_csc():
-    """Generate h5ad with CSC sparse X matrix."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    # Create sparse matrix with ~10% density
-    X = sparse.random(N_OBS, N_VARS, density=0.1, format='csc', dtype=np.float32, random_state=sparse_rng)
-    
-    adata = ad.AnnData(
-        X=X,
-        obs=pd.DataFrame(index=obs_names),
-        var=pd.DataFrame(index=var_names)
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "x_sparse_csc.h5ad")
-
-
-def generate_x_none():
-    """Generate h5ad with no X matrix (shape only)."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    adata = ad.AnnData(
-        X=None,
-        shape=(N_OBS, N_VARS),
-        obs=pd.DataFrame({"cluster": rng.choice(["A", "B"], N_OBS)}, index=obs_names),
-        var=pd.DataFrame({"type": rng.choice(["type1", "type2"], N_VARS)}, index=var_names)
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "x_none.h5ad")
-
-
-def generate_obsm_dense():
-    """Generate h5ad with dense numpy arrays in obsm/varm."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=pd.DataFrame(index=obs_names),
-        var=pd.DataFrame(index=var_names),
-        obsm={
-            "X_pca": rng.random((N_OBS, 10), dtype=np.float32),
-            "X_umap": rng.random((N_OBS, 2), dtype=np.float32),
-        },
-        varm={
-            "PCs": rng.random((N_VARS, 10), dtype=np.float32),
-        }
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "obsm_dense.h5ad")
-
-
-def generate_obsm_sparse():
-    """Generate h5ad with sparse matrices in obsm/varm."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=pd.DataFrame(index=obs_names),
-        var=pd.DataFrame(index=var_names),
-        obsm={
-            "X_sparse": sparse.random(N_OBS, 50, density=0.1, format='csr', dtype=np.float32, random_state=sparse_rng),
-        },
-        varm={
-            "Y_sparse": sparse.random(N_VARS, 30, density=0.1, format='csc', dtype=np.float32, random_state=sparse_rng),
-        }
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "obsm_sparse.h5ad")
-
-
-def generate_obsm_dataframe():
-    """Generate h5ad with DataFrames in obsm/varm."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=pd.DataFrame(index=obs_names),
-        var=pd.DataFrame(index=var_names),
-        obsm={
-            "X_df": pd.DataFrame(
-                rng.random((N_OBS, 5), dtype=np.float64),
-                columns=[f"PC{i}" for i in range(5)],
-                index=obs_names
-            ),
-        },
-        varm={
-            "Y_df": pd.DataFrame(
-                rng.random((N_VARS, 3), dtype=np.float64),
-                columns=[f"comp{i}" for i in range(3)],
-                index=var_names
-            ),
-        }
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "obsm_dataframe.h5ad")
-
-
-def generate_obsp_dense():
-    """Generate h5ad with dense square matrices in obsp/varp."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=pd.DataFrame(index=obs_names),
-        var=pd.DataFrame(index=var_names),
-        obsp={
-            "connectivities": rng.random((N_OBS, N_OBS), dtype=np.float32),
-            "distances": rng.random((N_OBS, N_OBS), dtype=np.float32),
-        },
-        varp={
-            "correlations": rng.random((N_VARS, N_VARS), dtype=np.float32),
-        }
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "obsp_dense.h5ad")
-
-
-def generate_obsp_sparse():
-    """Generate h5ad with sparse square matrices in obsp/varp."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
     
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=pd.DataFrame(index=obs_names),
-        var=pd.DataFrame(index=var_names),
-        obsp={
-            "connectivities": sparse.random(N_OBS, N_OBS, density=0.2, format='csr', dtype=np.float32, random_state=sparse_rng),
+    return pd.DataFrame({
+        "nullable_int": pd.arrays.IntegerArray(int_values, mask=int_mask),
+        "nullable_bool": pd.arrays.BooleanArray(bool_values, mask=bool_mask),
+    }, index=OBS_NAMES)
+
+
+def _uns_nested():
+    """Nested uns structures with scalars, arrays, dicts and a recarray."""
+    # Fill the recarray one field at a time
+    recarray = np.recarray((5,), dtype=[("name", "U10"), ("value", "f4"), ("count", "i4")])
+    recarray["name"] = np.char.add("item_", np.arange(5).astype(str))
+    recarray["value"] = np.arange(5) * 2
+    recarray["count"] = np.arange(5)
+    
+    return dict(uns={
+        "scalar_int": 42,
+        "scalar_float": 3.14,
+        "scalar_str": "test_string",
+        "scalar_bool": True,
+        "array_1d": np.array([1, 2, 3, 4, 5]),
+        "array_2d": rng.random((5, 3), dtype=np.float64),
+        "nested": {
+            "level1": {
+                "level2": "deep_value",
+                "array": np.array([10, 20, 30]),
+            },
+            "scalar": 100,
         },
-        varp={
-            "correlations": sparse.random(N_VARS, N_VARS, density=0.2, format='csc', dtype=np.float32, random_state=sparse_rng),
-        }
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "obsp_sparse.h5ad")
-
+        "recarray": recarray,
+    })
 
-def generate_layers_mixed():
-    """Generate h5ad with multiple layers (dense + sparse)."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=pd.DataFrame(index=obs_names),
-        var=pd.DataFrame(index=var_names),
-        layers={
-            "counts": rng.random((N_OBS, N_VARS), dtype=np.float32),
-            "normalized": sparse.random(N_OBS, N_VARS, density=0.1, format='csr', dtype=np.float32, random_state=sparse_rng),
-            "log": rng.random((N_OBS, N_VARS), dtype=np.float64),
-        }
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "layers_mixed.h5ad")
 
+def _run(name):
+    """Generate a single case in a worker process.
 
-def generate_uns_nested():
-    """Generate h5ad with nested uns structures."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=pd.DataFrame(index=obs_names),
-        var=pd.DataFrame(index=var_names),
-        uns={
-            "scalar_int": 42,
-            "scalar_float": 3.14,
-            "scalar_str": "test_string",
-            "scalar_bool": True,
-            "array_1d": np.array([1, 2, 3, 4, 5]),
-            "array_2d": rng.random((5, 3), dtype=np.float64),
-            "nested": {
-                "level1": {
-                    "level2": "deep_value",
-                    "array": np.array([10, 20, 30]),
+    The module-level RNG is re-seeded from the case name so every file gets
+    the same content regardless of which worker runs it, or in which order.
+    """
+    global rng
+    rng = np.random.default_rng([RANDOM_SEED, zlib.crc32(name.encode())])
+    build_and_write(CASES[name])
+
+
+CASES = {case.name: case for case in [
+    # Unnamed index (default, stored as _index)
+    Case(
+        "index_unnamed",
+        obs=lambda: pd.DataFrame({"cluster": rng.choice(["A", "B", "C"], N_OBS)}, index=OBS_NAMES),
+        var=lambda: pd.DataFrame({"gene_type": rng.choice(["protein", "rna"], N_VARS)}, index=VAR_NAMES),
+    ),
+    # Named index
+    Case(
+        "index_named",
+        obs=lambda: pd.DataFrame({"cluster": rng.choice(["A", "B", "C"], N_OBS)},
+                                 index=pd.Index(OBS_NAMES, name="cell_id")),
+        var=lambda: pd.DataFrame({"gene_type": rng.choice(["protein", "rna"], N_VARS)},
+                                 index=pd.Index(VAR_NAMES, name="gene_id")),
+    ),
+    # Integer-based index
+    Case(
+        "index_integer",
+        obs=lambda: pd.DataFrame({"cluster": rng.choice(["A", "B", "C"], N_OBS)},
+                                 index=pd.Index(range(N_OBS), dtype="int64")),
+        var=lambda: pd.DataFrame({"gene_type": rng.choice(["protein", "rna"], N_VARS)},
+                                 index=pd.Index(range(N_VARS), dtype="int64")),
+    ),
+    # Various numeric column types. Every column is a freshly drawn array of its
+    # own dtype: copy=False keeps them as they are instead of copying and
+    # consolidating them into blocks
+    Case(
+        "dtypes_numeric",
+        obs=lambda: pd.DataFrame({
+            "int8": rng.integers(-128, 127, N_OBS, dtype=np.int8),
+            "int16": rng.integers(-32768, 32767, N_OBS, dtype=np.int16),
+            "int32": rng.integers(-2147483648, 2147483647, N_OBS, dtype=np.int32),
+            "int64": rng.integers(-100, 100, N_OBS, dtype=np.int64),
+            "uint8": rng.integers(0, 255, N_OBS, dtype=np.uint8),
+            "float32": rng.random(N_OBS, dtype=np.float32),
+            "float64": rng.random(N_OBS, dtype=np.float64),
+        }, index=OBS_NAMES, copy=False),
+        var=lambda: pd.DataFrame({
+            "int32": rng.integers(0, 100, N_VARS, dtype=np.int32),
+            "float32": rng.random(N_VARS, dtype=np.float32),
+        }, index=VAR_NAMES, copy=False),
+    ),
+    # Categorical columns (ordered and unordered)
+    Case(
+        "dtypes_categorical",
+        obs=lambda: pd.DataFrame({
+            "cat_unordered": _rand_cat(["A", "B", "C"], N_OBS),
+            "cat_ordered": _rand_cat(["low", "medium", "high"], N_OBS, ordered=True),
+        }, index=OBS_NAMES),
+        var=lambda: pd.DataFrame({
+            "cat_unordered": _rand_cat(["type1", "type2"], N_VARS),
+        }, index=VAR_NAMES),
+    ),
+    # Boolean columns
+    Case(
+        "dtypes_boolean",
+        obs=lambda: pd.DataFrame({
+            "is_selected": rng.random(N_OBS) < 0.5,
+            "is_valid": rng.random(N_OBS) < 0.5,
+        }, index=OBS_NAMES),
+        var=lambda: pd.DataFrame({
+            "is_marker": rng.random(N_VARS) < 0.5,
+        }, index=VAR_NAMES),
+    ),
+    # Nullable integer and boolean types
+    Case("dtypes_nullable", obs=_dtypes_nullable_obs),
+    # String columns
+    Case(
+        "dtypes_string",
+        obs=lambda: pd.DataFrame({
+            "sample_id": [f"sample_{i}" for i in range(N_OBS)],
+            "batch": rng.choice(["batch1", "batch2", "batch3"], N_OBS),
+        }, index=OBS_NAMES),
+        var=lambda: pd.DataFrame({
+            "gene_symbol": [f"GENE_{i}" for i in range(N_VARS)],
+        }, index=VAR_NAMES),
+    ),
+    # Dense float32 / float64 X matrix
+    Case("x_dense_float32", X="dense_f32"),
+    Case("x_dense_float64", X="dense_f64"),
+    # CSR / CSC sparse X matrix with ~10% density
+    Case("x_sparse_csr", X="sparse_csr"),
+    Case("x_sparse_csc", X="sparse_csc"),
+    # No X matrix (shape only)
+    Case(
+        "x_none",
+        X="none",
+        obs=lambda: pd.DataFrame({"cluster": rng.choice(["A", "B"], N_OBS)}, index=OBS_NAMES),
+        var=lambda: pd.DataFrame({"type": rng.choice(["type1", "type2"], N_VARS)}, index=VAR_NAMES),
+    ),
+    # Dense numpy arrays in obsm/varm
+    Case(
+        "obsm_dense",
+        extra=lambda: dict(
+            obsm={
+                "X_pca": rng.random((N_OBS, 10), dtype=np.float32),
+                "X_umap": rng.random((N_OBS, 2), dtype=np.float32),
+            },
+            varm={
+                "PCs": rng.random((N_VARS, 10), dtype=np.float32),
+            },
+        ),
+    ),
+    # Sparse matrices in obsm/varm
+    Case(
+        "obsm_sparse",
+        extra=lambda: dict(
+            obsm={
+                "X_sparse": _rand_sparse(N_OBS, 50, 0.1, "csr"),
+            },
+            varm={
+                "Y_sparse": _rand_sparse(N_VARS, 30, 0.1, "csc"),
+            },
+        ),
+    ),
+    # DataFrames in obsm/varm
+    Case(
+        "obsm_dataframe",
+        extra=lambda: dict(
+            obsm={
+                "X_df": pd.DataFrame(
+                    rng.random((N_OBS, 5), dtype=np.float64),
+                    columns=[f"PC{i}" for i in range(5)],
+                    index=OBS_NAMES
+                ),
+            },
+            varm={
+                "Y_df": pd.DataFrame(
+                    rng.random((N_VARS, 3), dtype=np.float64),
+                    columns=[f"comp{i}" for i in range(3)],
+                    index=VAR_NAMES
+                ),
+            },
+        ),
+    ),
+    # Dense square matrices in obsp/varp
+    Case(
+        "obsp_dense",
+        extra=lambda: dict(
+            obsp={
+                "connectivities": rng.random((N_OBS, N_OBS), dtype=np.float32),
+                "distances": rng.random((N_OBS, N_OBS), dtype=np.float32),
+            },
+            varp={
+                "correlations": rng.random((N_VARS, N_VARS), dtype=np.float32),
+            },
+        ),
+    ),
+    # Sparse square matrices in obsp/varp
+    Case(
+        "obsp_sparse",
+        extra=lambda: dict(
+            obsp={
+                "connectivities": _rand_sparse(N_OBS, N_OBS, 0.2, "csr"),
+            },
+            varp={
+                "correlations": _rand_sparse(N_VARS, N_VARS, 0.2, "csc"),
+            },
+        ),
+    ),
+    # Multiple layers (dense + sparse)
+    Case(
+        "layers_mixed",
+        extra=lambda: dict(
+            layers={
+                "counts": rng.random((N_OBS, N_VARS), dtype=np.float32),
+                "normalized": _rand_sparse(N_OBS, N_VARS, 0.1, "csr"),
+                "log": rng.random((N_OBS, N_VARS), dtype=np.float64),
+            },
+        ),
+    ),
+    # Nested uns structures
+    Case("uns_nested", extra=_uns_nested),
+    # Minimal valid AnnData (just X)
+    Case("edge_minimal"),
+    # Zero observations
+    Case(
+        "edge_empty_obs",
+        X="none",
+        obs=lambda: pd.DataFrame(index=pd.Index([], dtype="str")),
+        var=lambda: pd.DataFrame({"type": rng.choice(["type1", "type2"], N_VARS)}, index=VAR_NAMES),
+    ),
+    # Unicode in indices and values
+    Case(
+        "edge_unicode",
+        obs=lambda: pd.DataFrame({
+            "cluster": rng.choice(["A", "B", "C"], N_OBS),
+            "description": [f"Sample {i} with émojis 🧬" for i in range(N_OBS)],
+        }, index=[f"cell_{i}_αβγ" for i in range(N_OBS)]),
+        var=lambda: pd.DataFrame({
+            "symbol": [f"GENE_{i}_🎯" for i in range(N_VARS)],
+        }, index=[f"gene_{i}_日本語" for i in range(N_VARS)]),
+    ),
+    # All features combined
+    Case(
+        "full_featured",
+        X="sparse_csr",
+        obs=lambda: pd.DataFrame({
+            "cluster": _rand_cat(["A", "B", "C"], N_OBS),
+            "n_genes": rng.integers(100, 1000, N_OBS, dtype=np.int32),
+            "total_counts": rng.random(N_OBS, dtype=np.float32),
+            "is_selected": rng.random(N_OBS) < 0.5,
+        }, index=OBS_NAMES),
+        var=lambda: pd.DataFrame({
+            "gene_type": _rand_cat(["protein", "rna"], N_VARS),
+            "n_cells": rng.integers(0, N_OBS, N_VARS, dtype=np.int32),
+            "mean_counts": rng.random(N_VARS, dtype=np.float32),
+        }, index=VAR_NAMES),
+        extra=lambda: dict(
+            obsm={
+                "X_pca": rng.random((N_OBS, 10), dtype=np.float32),
+                "X_umap": rng.random((N_OBS, 2), dtype=np.float32),
+            },
+            varm={
+                "PCs": rng.random((N_VARS, 10), dtype=np.float32),
+            },
+            obsp={
+                "connectivities": _rand_sparse(N_OBS, N_OBS, 0.2, "csr"),
+            },
+            varp={
+                "correlations": _rand_sparse(N_VARS, N_VARS, 0.2, "csc"),
+            },
+            layers={
+                "counts": rng.random((N_OBS, N_VARS), dtype=np.float32),
+                "normalized": _rand_sparse(N_OBS, N_VARS, 0.1, "csr"),
+            },
+            uns={
+                "neighbors": {
+                    "params": {"n_neighbors": 15, "method": "umap"},
+                },
+                "pca": {
+                    "variance": rng.random(10, dtype=np.float32),
                 },
-                "scalar": 100,
+                "scalar": 42,
             },
-            "recarray": np.recarray(
-                (5,),
-                dtype=[("name", "U10"), ("value", "f4"), ("count", "i4")]
-            ),
-        }
-    )
-    # Fill recarray
-    for i in range(5):
-        adata.uns["recarray"][i] = (f"item_{i}", float(i * 2), i)
-    
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "uns_nested.h5ad")
-
-
-def generate_edge_minimal():
-    """Generate minimal valid AnnData (just X)."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=pd.DataFrame(index=obs_names),
-        var=pd.DataFrame(index=var_names)
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "edge_minimal.h5ad")
-
-
-def generate_edge_empty_obs():
-    """Generate h5ad with zero observations."""
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    adata = ad.AnnData(
-        X=None,
-        shape=(0, N_VARS),
-        obs=pd.DataFrame(index=pd.Index([], dtype="str")),
-        var=pd.DataFrame({"type": rng.choice(["type1", "type2"], N_VARS)}, index=var_names)
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "edge_empty_obs.h5ad")
-
-
-def generate_edge_unicode():
-    """Generate h5ad with unicode in indices and values."""
-    obs_names = [f"cell_{i}_αβγ" for i in range(N_OBS)]
-    var_names = [f"gene_{i}_日本語" for i in range(N_VARS)]
-    
-    obs = pd.DataFrame({
-        "cluster": rng.choice(["A", "B", "C"], N_OBS),
-        "description": [f"Sample {i} with émojis 🧬" for i in range(N_OBS)],
-    }, index=obs_names)
-    
-    var = pd.DataFrame({
-        "symbol": [f"GENE_{i}_🎯" for i in range(N_VARS)],
-    }, index=var_names)
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=obs,
-        var=var
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
-    
-    adata.write_h5ad(output_dir / "edge_unicode.h5ad")
+        ),
+    ),
+    # Internal gzip compression on datasets. This tests that nf-anndata can
+    # read h5ad files where the HDF5 datasets are internally compressed using
+    # gzip (deflate) compression. This is different from externally gzipping
+    # the entire file (.h5ad.gz).
+    Case(
+        "compression_gzip",
+        X="dense_f32",
+        obs=lambda: pd.DataFrame({
+            "cluster": _rand_cat(["A", "B", "C"], N_OBS),
+            "n_genes": rng.integers(100, 1000, N_OBS, dtype=np.int32),
+            "total_counts": rng.random(N_OBS, dtype=np.float32),
+        }, index=OBS_NAMES),
+        var=lambda: pd.DataFrame({
+            "gene_type": _rand_cat(["protein", "rna"], N_VARS),
+            "mean_counts": rng.random(N_VARS, dtype=np.float32),
+        }, index=VAR_NAMES),
+        extra=lambda: dict(
+            obsm={
+                "X_pca": rng.random((N_OBS, 10), dtype=np.float32),
+            },
+            layers={
+                "counts": rng.random((N_OBS, N_VARS), dtype=np.float32),
+            },
+            uns={
+                "description": "Test file with gzip compression",
+                "compression_level": 4,
+            },
+        ),
+        write_kwargs={"compression": "gzip"},
+    ),
+    # High-level gzip compression (level 9) on a sparse X, which compresses
+    # well. This intentionally stays on gzip rather than a faster codec such as
+    # Blosc/zstd: those need a third-party HDF5 filter plugin to be read back,
+    # and gzip is what anndata itself offers for h5ad files.
+    Case(
+        "compression_gzip_high",
+        X="sparse_csr",
+        obs=lambda: pd.DataFrame({
+            "cluster": _rand_cat(["A", "B", "C"], N_OBS),
+            "batch": rng.choice(["batch1", "batch2"], N_OBS),
+        }, index=OBS_NAMES),
+        var=lambda: pd.DataFrame({
+            "gene_symbol": [f"GENE_{i}" for i in range(N_VARS)],
+        }, index=VAR_NAMES),
+        extra=lambda: dict(
+            layers={
+                "normalized": _rand_sparse(N_OBS, N_VARS, 0.1, "csr"),
+            },
+        ),
+        write_kwargs={"compression": "gzip", "compression_opts": 9},
+    ),
+]}
 
 
-def generate_compression_gzip():
-    """Generate h5ad with internal gzip compression on datasets.
+def generate_pbmc3k(force=False):
+    """Generate the original pbmc3k_processed.h5ad file (for backwards compatibility).
     
-    This tests that nf-anndata can read h5ad files where the HDF5 datasets
-    are internally compressed using gzip (deflate) compression. This is
-    different from externally gzipping the entire file (.h5ad.gz).
+    This needs scanpy and a download, so an existing file is kept as is
+    unless ``force`` is set. Returns whether the file was written.
     """
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    obs = pd.DataFrame({
-        "cluster": pd.Categorical(rng.choice(["A", "B", "C"], N_OBS), ordered=False),
-        "n_genes": rng.integers(100, 1000, N_OBS, dtype=np.int32),
-        "total_counts": rng.random(N_OBS, dtype=np.float32),
-    }, index=obs_names)
-    
-    var = pd.DataFrame({
-        "gene_type": pd.Categorical(rng.choice(["protein", "rna"], N_VARS), ordered=False),
-        "mean_counts": rng.random(N_VARS, dtype=np.float32),
-    }, index=var_names)
-    
-    adata = ad.AnnData(
-        X=rng.random((N_OBS, N_VARS), dtype=np.float32),
-        obs=obs,
-        var=var,
-        obsm={
-            "X_pca": rng.random((N_OBS, 10), dtype=np.float32),
-        },
-        layers={
-            "counts": rng.random((N_OBS, N_VARS), dtype=np.float32),
-        },
-        uns={
-            "description": "Test file with gzip compression",
-            "compression_level": 4,
-        }
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
+    if not force and (output_dir / "pbmc3k_processed.h5ad").exists():
+        tqdm.write("pbmc3k_processed.h5ad already exists, skipping")
+        return False
     
-    # Write with gzip compression enabled
-    adata.write_h5ad(output_dir / "compression_gzip.h5ad", compression="gzip")
+    import scanpy as sc
 
+    # Keep scanpy's dataset cache in a persistent user cache directory rather
+    # than a 'data' subdirectory in the script's location, so the download is
+    # reused across runs. An empty XDG_CACHE_HOME means "use the default"
+    cache_home = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    cache_dir = cache_home / "nf-anndata" / "scanpy_datasets"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    sc.settings.datasetdir = cache_dir
 
-def generate_compression_gzip_high():
-    """Generate h5ad with high-level gzip compression (level 9).
-    
-    Tests maximum gzip compression level to ensure nf-anndata handles
-    heavily compressed datasets correctly.
-    """
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    # Create sparse matrix - compresses well
-    X = sparse.random(N_OBS, N_VARS, density=0.1, format='csr', dtype=np.float32, random_state=sparse_rng)
-    
-    obs = pd.DataFrame({
-        "cluster": pd.Categorical(rng.choice(["A", "B", "C"], N_OBS), ordered=False),
-        "batch": rng.choice(["batch1", "batch2"], N_OBS),
-    }, index=obs_names)
-    
-    var = pd.DataFrame({
-        "gene_symbol": [f"GENE_{i}" for i in range(N_VARS)],
-    }, index=var_names)
-    
-    adata = ad.AnnData(
-        X=X,
-        obs=obs,
-        var=var,
-        layers={
-            "normalized": sparse.random(N_OBS, N_VARS, density=0.1, format='csr', dtype=np.float32, random_state=sparse_rng),
-        },
-    )
+    adata = sc.datasets.pbmc3k_processed()
     adata.obs.index.name = None
     adata.var.index.name = None
-    
-    # Write with maximum gzip compression
-    adata.write_h5ad(output_dir / "compression_gzip_high.h5ad", compression="gzip", compression_opts=9)
+    adata.layers["counts"] = adata.X
+    _write(adata, "pbmc3k_processed.h5ad")
+    return True
 
 
-def generate_full_featured():
-    """Generate h5ad with all features combined."""
-    obs_names = [f"cell_{i}" for i in range(N_OBS)]
-    var_names = [f"gene_{i}" for i in range(N_VARS)]
-    
-    obs = pd.DataFrame({
-        "cluster": pd.Categorical(rng.choice(["A", "B", "C"], N_OBS), ordered=False),
-        "n_genes": rng.integers(100, 1000, N_OBS, dtype=np.int32),
-        "total_counts": rng.random(N_OBS, dtype=np.float32),
-        "is_selected": rng.choice([True, False], N_OBS).astype(bool),
-    }, index=obs_names)
-    
-    var = pd.DataFrame({
-        "gene_type": pd.Categorical(rng.choice(["protein", "rna"], N_VARS), ordered=False),
-        "n_cells": rng.integers(0, N_OBS, N_VARS, dtype=np.int32),
-        "mean_counts": rng.random(N_VARS, dtype=np.float32),
-    }, index=var_names)
+if __name__ == "__main__":
+    case_names = list(CASES) + ["pbmc3k_processed"]
     
-    adata = ad.AnnData(
-        X=sparse.random(N_OBS, N_VARS, density=0.1, format='csr', dtype=np.float32, random_state=sparse_rng),
-        obs=obs,
-        var=var,
-        obsm={
-            "X_pca": rng.random((N_OBS, 10), dtype=np.float32),
-            "X_umap": rng.random((N_OBS, 2), dtype=np.float32),
-        },
-        varm={
-            "PCs": rng.random((N_VARS, 10), dtype=np.float32),
-        },
-        obsp={
-            "connectivities": sparse.random(N_OBS, N_OBS, density=0.2, format='csr', dtype=np.float32, random_state=sparse_rng),
-        },
-        varp={
-            "correlations": sparse.random(N_VARS, N_VARS, density=0.2, format='csc', dtype=np.float32, random_state=sparse_rng),
-        },
-        layers={
-            "counts": rng.random((N_OBS, N_VARS), dtype=np.float32),
-            "normalized": sparse.random(N_OBS, N_VARS, density=0.1, format='csr', dtype=np.float32, random_state=sparse_rng),
-        },
-        uns={
-            "neighbors": {
-                "params": {"n_neighbors": 15, "method": "umap"},
-            },
-            "pca": {
-                "variance": rng.random(10, dtype=np.float32),
-            },
-            "scalar": 42,
-        }
-    )
-    adata.obs.index.name = None
-    adata.var.index.name = None
+    parser = argparse.ArgumentParser(description="Generate the nf-anndata test h5ad files.")
+    parser.add_argument("--only", nargs="+", metavar="CASE", choices=case_names,
+                        help="only generate these cases (file name without .h5ad)")
+    parser.add_argument("--skip", nargs="+", metavar="CASE", choices=case_names, default=[],
+                        help="do not generate these cases (file name without .h5ad)")
+    parser.add_argument("--force", action="store_true",
+                        help="regenerate pbmc3k_processed.h5ad even if it already exists "
+                             "(implied when it is named in --only)")
+    args = parser.parse_args()
     
-    adata.write_h5ad(output_dir / "full_featured.h5ad")
-
-
-def generate_pbmc3k():
-    """Generate the original pbmc3k_processed.h5ad file (for backwards compatibility)."""
-    import scanpy as sc
-    import tempfile
-
-    # Use a temporary directory for scanpy's dataset cache to avoid creating
-    # a 'data' subdirectory in the script's location
-    with tempfile.TemporaryDirectory() as tmpdir:
-        sc.settings.datasetdir = tmpdir
-        adata = sc.datasets.pbmc3k_processed()
-        adata.obs.index.name = None
-        adata.var.index.name = None
-        adata.layers["counts"] = adata.X
-        adata.write_h5ad(output_dir / "pbmc3k_processed.h5ad")
-
-
-if __name__ == "__main__":
-    # List of all generation functions with their display names
-    test_generators = [
-        ("index_unnamed.h5ad", generate_index_unnamed),
-        ("index_named.h5ad", generate_index_named),
-        ("index_integer.h5ad", generate_index_integer),
-        ("dtypes_numeric.h5ad", generate_dtypes_numeric),
-        ("dtypes_categorical.h5ad", generate_dtypes_categorical),
-        ("dtypes_boolean.h5ad", generate_dtypes_boolean),
-        ("dtypes_nullable.h5ad", generate_dtypes_nullable),
-        ("dtypes_string.h5ad", generate_dtypes_string),
-        ("x_dense_float32.h5ad", generate_x_dense_float32),
-        ("x_dense_float64.h5ad", generate_x_dense_float64),
-        ("x_sparse_csr.h5ad", generate_x_sparse_csr),
-        ("x_sparse_csc.h5ad", generate_x_sparse_csc),
-        ("x_none.h5ad", generate_x_none),
-        ("obsm_dense.h5ad", generate_obsm_dense),
-        ("obsm_sparse.h5ad", generate_obsm_sparse),
-        ("obsm_dataframe.h5ad", generate_obsm_dataframe),
-        ("obsp_dense.h5ad", generate_obsp_dense),
-        ("obsp_sparse.h5ad", generate_obsp_sparse),
-        ("layers_mixed.h5ad", generate_layers_mixed),
-        ("uns_nested.h5ad", generate_uns_nested),
-        ("edge_minimal.h5ad", generate_edge_minimal),
-        ("edge_empty_obs.h5ad", generate_edge_empty_obs),
-        ("edge_unicode.h5ad", generate_edge_unicode),
-        ("full_featured.h5ad", generate_full_featured),
-        ("compression_gzip.h5ad", generate_compression_gzip),
-        ("compression_gzip_high.h5ad", generate_compression_gzip_high),
-    ]
+    selected = {name for name in (args.only or case_names) if name not in args.skip}
+    test_cases = [name for name in CASES if name in selected]
     
     tqdm.write("Generating comprehensive test h5ad files...")
     tqdm.write("=" * 60)
     
-    # Generate all test case files with progress bar
-    for filename, generator_func in tqdm(test_generators, desc="Generating test cases", unit="file"):
-        generator_func()
+    # Generate all test case files in parallel; each file is independent
+    if test_cases:
+        with multiprocessing.Pool() as pool:
+            list(tqdm(
+                pool.imap_unordered(_run, test_cases),
+                total=len(test_cases), desc="Generating test cases", unit="file",
+            ))
+    
+    n_written = len(test_cases)
     
     # Generate original pbmc3k file
-    tqdm.write("\n" + "=" * 60)
-    tqdm.write("Generating pbmc3k_processed.h5ad...")
-    generate_pbmc3k()
+    if "pbmc3k_processed" in selected:
+        tqdm.write("\n" + "=" * 60)
+        tqdm.write("Generating pbmc3k_processed.h5ad...")
+        force = args.force or "pbmc3k_processed" in (args.only or [])
+        n_written += generate_pbmc3k(force=force)
     
     tqdm.write("\n" + "=" * 60)
-    tqdm.write(f"All h5ad files generated in '{output_dir}/' directory")
-    tqdm.write(f"Total files: {len(test_generators) + 1} (26 test cases + 1 pbmc3k)")
+    tqdm.write(f"Wrote {n_written} h5ad file(s) to '{output_dir}/'")